@@ -1,10 +1,7 @@
 import json
 import pandas as pd
 import numpy as np
-
-# Load your data
-with open('northeastern_cafes.json', 'r') as f:
-    cafes = json.load(f)
+from corpus import CompactCorpus
 
 # Define aspect keywords
 aspects = {
@@ -51,40 +48,8 @@ aspects = {
     }
 }
 
-def find_aspect_mentions(text, aspect_keywords):
-    """Find which keywords are mentioned in a review"""
-    text_lower = text.lower()
-    mentions = {
-        'positive': [],
-        'negative': []
-    }
-    
-    for keyword in aspect_keywords['positive']:
-        if keyword in text_lower:
-            mentions['positive'].append(keyword)
-    
-    for keyword in aspect_keywords['negative']:
-        if keyword in text_lower:
-            mentions['negative'].append(keyword)
-    
-    return mentions
-
-def score_aspect(reviews, aspect_keywords):
-    """Score an aspect based on positive/negative keyword mentions"""
-    positive_count = 0
-    negative_count = 0
-    
-    # Combine all review texts
-    all_text = ' '.join([r['text'].lower() for r in reviews])
-    
-    # Count positive mentions
-    for keyword in aspect_keywords['positive']:
-        positive_count += all_text.count(keyword)
-    
-    # Count negative mentions
-    for keyword in aspect_keywords['negative']:
-        negative_count += all_text.count(keyword)
-    
+def score_aspect(positive_count, negative_count):
+    """Score an aspect based on how many positive/negative keyword mentions it has"""
     # If aspect not mentioned, return None
     if positive_count + negative_count == 0:
         return None
@@ -125,68 +90,21 @@ def calculate_studyability(aspect_scores, google_rating):
     # No data at all
     return None
 
-def analyze_review(review_text):
-    """Analyze a single review for all aspects"""
-    analysis = {}
-    
-    for aspect_name, keywords in aspects.items():
-        mentions = find_aspect_mentions(review_text, keywords)
-        
-        # Only include if there are mentions
-        if mentions['positive'] or mentions['negative']:
-            analysis[aspect_name] = mentions
-    
-    return analysis
-
-# Analyze all cafes
-results = []
-detailed_results = []
-
-print("Analyzing cafes...\n")
-
-for cafe in cafes:
-    print(f"Analyzing: {cafe['name']}")
-    
-    # Calculate aspect scores
-    scores = {}
-    for aspect_name, keywords in aspects.items():
-        scores[aspect_name] = score_aspect(cafe['reviews'], keywords)
-    
-    # Calculate overall studyability including Google rating
-    studyability = calculate_studyability(scores, cafe.get('rating'))
-    
-    # Analyze individual reviews
+def detailed_result(cafe, studyability, scores):
+    """Full result for one cafe, including its analyzed reviews"""
     analyzed_reviews = []
     for review in cafe['reviews']:
-        review_analysis = analyze_review(review['text'])
-        
+        # Keyword hits were already found when the corpus was built
         analyzed_reviews.append({
             'author': review['author'],
             'rating': review['rating'],
             'text': review['text'],
             'time': review['time'],
-            'aspect_mentions': review_analysis
+            'aspect_mentions': review['aspect_mentions']
         })
-    
-    # Store summary results for CSV
-    results.append({
-        'name': cafe['name'],
-        'address': cafe['address'],
-        'studyability': studyability,
-        'noise': scores['noise'],
-        'wifi': scores['wifi'],
-        'outlets': scores['outlets'],
-        'seating': scores['seating'],
-        'study_friendly': scores['study_friendly'],
-        'atmosphere': scores['atmosphere'],
-        'google_rating': cafe['rating'],
-        'num_reviews': len(cafe['reviews']),
-        'lat': cafe['lat'],
-        'lng': cafe['lng']
-    })
-    
-    # Store detailed results with reviews for JSON
-    detailed_results.append({
+
+    return {
+        'uid': cafe.get('uid'),
         'name': cafe['name'],
         'address': cafe['address'],
         'lat': cafe['lat'],
@@ -204,62 +122,125 @@ for cafe in cafes:
         },
         'reviews': analyzed_reviews,
         'review_count': len(analyzed_reviews)
-    })
-
-# Create DataFrame for CSV
-df = pd.DataFrame(results)
+    }
 
-# Sort by studyability score
-df_sorted = df.sort_values('studyability', ascending=False, na_position='last')
+def write_json_list(f, items):
+    """
+    Write items as a JSON list one at a time (same output as json.dump(..., indent=2)),
+    so only one item has to be in memory at once
+    """
+    first = True
+    for item in items:
+        f.write('[\n  ' if first else ',\n  ')
+        f.write(json.dumps(item, indent=2).replace('\n', '\n  '))
+        first = False
+
+    f.write('[]' if first else '\n]')
+
+def main():
+    # Load your data (one cafe at a time, straight into the compact corpus)
+    cafes = CompactCorpus.load('northeastern_cafes.json', aspects)
+
+    # Analyze all cafes
+    results = []
+    detailed_keys = []
+
+    print("Analyzing cafes...\n")
+
+    for cafe in cafes:
+        print(f"Analyzing: {cafe['name']}")
+
+        # Calculate aspect scores from the keyword counts found while loading
+        counts = cafes.aspect_counts(cafe.index)
+        scores = {}
+        for aspect_name in aspects:
+            scores[aspect_name] = score_aspect(*counts[aspect_name])
+
+        # Calculate overall studyability including Google rating
+        studyability = calculate_studyability(scores, cafe.get('rating'))
+
+        # Store summary results for CSV
+        results.append({
+            'uid': cafe.get('uid'),
+            'name': cafe['name'],
+            'address': cafe['address'],
+            'studyability': studyability,
+            'noise': scores['noise'],
+            'wifi': scores['wifi'],
+            'outlets': scores['outlets'],
+            'seating': scores['seating'],
+            'study_friendly': scores['study_friendly'],
+            'atmosphere': scores['atmosphere'],
+            'google_rating': cafe['rating'],
+            'num_reviews': len(cafe['reviews']),
+            'lat': cafe['lat'],
+            'lng': cafe['lng']
+        })
 
-# Save CSV (summary scores)
-df_sorted.to_csv('cafe_studyability_scores.csv', index=False)
+        # Keep just what's needed to sort - the full results are built while saving
+        detailed_keys.append((cafe.index, studyability, scores))
 
-# Sort detailed results by studyability too
-detailed_sorted = sorted(
-    detailed_results, 
-    key=lambda x: x['studyability_score'] if x['studyability_score'] is not None else -1,
-    reverse=True
-)
+    # Create DataFrame for CSV
+    df = pd.DataFrame(results)
 
-# Save JSON (full data with reviews)
-with open('cafe_studyability_detailed.json', 'w') as f:
-    json.dump(detailed_sorted, f, indent=2)
+    # Sort by studyability score
+    df_sorted = df.sort_values('studyability', ascending=False, na_position='last')
 
-print("\n" + "="*60)
-print("ANALYSIS COMPLETE!")
-print("="*60)
+    # Save CSV (summary scores)
+    df_sorted.to_csv('cafe_studyability_scores.csv', index=False)
 
-# Show top 10
-print("\n🏆 TOP 10 STUDY SPOTS:\n")
-top_10 = df_sorted.head(10)
+    # Sort detailed results by studyability too
+    detailed_sorted = sorted(
+        detailed_keys,
+        key=lambda x: x[1] if x[1] is not None else -1,
+        reverse=True
+    )
 
-for i, row in enumerate(top_10.itertuples(), 1):
-    if pd.notna(row.studyability):
-        print(f"{i:2d}. {row.name:40s} Score: {row.studyability}/10 (Google: {row.google_rating}⭐)")
-    else:
-        print(f"{i:2d}. {row.name:40s} Score: N/A (not enough data)")
+    # Save JSON (full data with reviews), one cafe at a time
+    with open('cafe_studyability_detailed.json', 'w') as f:
+        write_json_list(f, (
+            detailed_result(cafes[index], studyability, scores)
+            for index, studyability, scores in detailed_sorted
+        ))
 
-print(f"\n✓ Summary scores saved to: cafe_studyability_scores.csv")
-print(f"✓ Detailed data with reviews saved to: cafe_studyability_detailed.json")
+    print("\n" + "="*60)
+    print("ANALYSIS COMPLETE!")
+    print("="*60)
 
-# Show scoring breakdown for top cafe
-print("\n" + "="*60)
-print("SCORING BREAKDOWN (Top Cafe):")
-print("="*60)
+    # Show top 10
+    print("\n🏆 TOP 10 STUDY SPOTS:\n")
+    top_10 = df_sorted.head(10)
 
-if detailed_sorted:
-    sample = detailed_sorted[0]
-    print(f"\nCafe: {sample['name']}")
-    print(f"Overall Studyability Score: {sample['studyability_score']}/10")
-    print(f"\nScore Components:")
-    print(f"  Google Rating: {sample['google_rating']}/5 ⭐")
-    print(f"\n  Aspect Scores:")
-    for aspect, score in sample['aspect_scores'].items():
-        if score is not None:
-            print(f"    {aspect.capitalize():15} {score}/10")
+    for i, row in enumerate(top_10.itertuples(), 1):
+        if pd.notna(row.studyability):
+            print(f"{i:2d}. {row.name:40s} Score: {row.studyability}/10 (Google: {row.google_rating}⭐)")
         else:
-            print(f"    {aspect.capitalize():15} No data")
-    
-    print(f"\n  Formula: 70% aspect scores + 30% Google rating")
-    print(f"  Reviews analyzed: {sample['review_count']}")
\ No newline at end of file
+            print(f"{i:2d}. {row.name:40s} Score: N/A (not enough data)")
+
+    print(f"\n✓ Summary scores saved to: cafe_studyability_scores.csv")
+    print(f"✓ Detailed data with reviews saved to: cafe_studyability_detailed.json")
+
+    # Show scoring breakdown for top cafe
+    print("\n" + "="*60)
+    print("SCORING BREAKDOWN (Top Cafe):")
+    print("="*60)
+
+    if detailed_sorted:
+        index, studyability, scores = detailed_sorted[0]
+        sample = detailed_result(cafes[index], studyability, scores)
+        print(f"\nCafe: {sample['name']}")
+        print(f"Overall Studyability Score: {sample['studyability_score']}/10")
+        print(f"\nScore Components:")
+        print(f"  Google Rating: {sample['google_rating']}/5 ⭐")
+        print(f"\n  Aspect Scores:")
+        for aspect, score in sample['aspect_scores'].items():
+            if score is not None:
+                print(f"    {aspect.capitalize():15} {score}/10")
+            else:
+                print(f"    {aspect.capitalize():15} No data")
+
+        print(f"\n  Formula: 70% aspect scores + 30% Google rating")
+        print(f"  Reviews analyzed: {sample['review_count']}")
+
+if __name__ == '__main__':
+    main()
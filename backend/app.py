@@ -2,17 +2,47 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import requests
 import os
+import json
+import math
+import time
 from dotenv import load_dotenv
+from entity_resolution import CafeIdMap
+from scoring_service import ScoringService, StudyabilityScorer
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+# Links the same cafe across OpenStreetMap, Foursquare and Google results
+cafe_id_map = CafeIdMap()
+
+# Live studyability scores, updated as new review events come in.
+# Nothing is loaded or started until start_scoring() is called.
+scorer = StudyabilityScorer(half_life_days=float(os.getenv('REVIEW_HALF_LIFE_DAYS', 0)) or None)
+scoring_service = ScoringService(scorer)
+
+def start_scoring():
+    """Seed the scorer from the saved cafe data and start the background threads"""
+    if os.path.exists('northeastern_cafes.json'):
+        with open('northeastern_cafes.json', 'r') as f:
+            scorer.load_cafes(json.load(f))
+    
+    scoring_service.start()
+    if os.getenv('REVIEW_EVENTS_FILE'):
+        scoring_service.tail_file(os.getenv('REVIEW_EVENTS_FILE'))
+
 # API Keys (FREE APIs only - NO Pinterest for now)
 FOURSQUARE_API_KEY = os.getenv('FOURSQUARE_API_KEY', '')
 UNSPLASH_ACCESS_KEY = os.getenv('UNSPLASH_ACCESS_KEY', '')
 
+def attach_studyability(cafes):
+    """Add each cafe's live studyability score (None if we have no data for it)"""
+    for cafe in cafes:
+        score = scorer.get_score(cafe['uid']) if cafe.get('uid') else None
+        cafe['studyability'] = score['studyability_score'] if score else None
+        cafe['aspect_scores'] = score['aspect_scores'] if score else None
+
 # Home endpoint
 @app.route('/')
 def home():
@@ -25,7 +55,9 @@ def home():
             'nearby_cafes': '/api/cafes/nearby?lat=42.36&lng=-71.05',
             'search_cafes': '/api/cafes/search?query=starbucks&lat=42.36&lng=-71.05',
             'aesthetic_photos': '/api/aesthetic/photos?query=cozy cafe',
-            'checkin': 'POST /api/checkin'
+            'checkin': 'POST /api/checkin',
+            'add_review': 'POST /api/reviews',
+            'studyability': '/api/cafes/<cafe_id>/studyability'
         }
     })
 
@@ -73,6 +105,11 @@ def get_nearby_cafes():
                 }
                 cafes.append(cafe)
         
+        # Attach cross-source IDs and drop duplicates
+        cafes = cafe_id_map.resolve_cafes('osm', cafes)
+        cafe_id_map.save()
+        attach_studyability(cafes)
+        
         return jsonify({
             'success': True,
             'cafes': cafes,
@@ -129,6 +166,11 @@ def search_cafes():
                 }
                 cafes.append(cafe)
             
+            # Attach cross-source IDs and drop duplicates
+            cafes = cafe_id_map.resolve_cafes('foursquare', cafes)
+            cafe_id_map.save()
+            attach_studyability(cafes)
+            
             return jsonify({
                 'success': True,
                 'cafes': cafes,
@@ -272,6 +314,71 @@ def checkin():
         }
     })
 
+# Add a review event - the cafe's studyability score is updated in the background
+@app.route('/api/reviews', methods=['POST'])
+def add_review():
+    data = request.json or {}
+    
+    if not isinstance(data.get('cafe_id'), str) or not isinstance(data.get('text'), str) \
+            or not data['cafe_id'] or not data['text']:
+        return jsonify({
+            'success': False,
+            'error': 'cafe_id and text are required'
+        }), 400
+    
+    # The scorer compares/decays these as numbers, so reject anything else up front
+    # (including NaN/Infinity, which Flask's JSON parser accepts)
+    for field in ('time', 'rating'):
+        value = data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                  or not math.isfinite(value)):
+            return jsonify({
+                'success': False,
+                'error': f'{field} must be a number'
+            }), 400
+    
+    # Only cafes we already know about - otherwise any string would get its own counters
+    if data['cafe_id'] not in cafe_id_map.places and scorer.get_score(data['cafe_id']) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown cafe_id'
+        }), 404
+    
+    # Missing or future times are counted as now
+    now = time.time()
+    review_time = data.get('time')
+    review_time = now if review_time is None else min(review_time, now)
+    
+    # google_rating is deliberately not accepted here - it only comes from our own data
+    scoring_service.submit({
+        'cafe_id': data['cafe_id'],
+        'author': data.get('author'),
+        'rating': data.get('rating'),
+        'text': data['text'],
+        'time': review_time
+    })
+    
+    return jsonify({
+        'success': True,
+        'message': 'Review queued for scoring'
+    }), 202
+
+# Get the latest studyability score for a cafe
+@app.route('/api/cafes/<cafe_id>/studyability', methods=['GET'])
+def get_studyability(cafe_id):
+    score = scorer.get_score(cafe_id)
+    
+    if score is None:
+        return jsonify({
+            'success': False,
+            'error': 'No studyability score for this cafe yet'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        **score
+    })
+
 # Get check-ins for a cafe (mock data)
 @app.route('/api/cafes/<cafe_id>/checkins', methods=['GET'])
 def get_checkins(cafe_id):
@@ -315,4 +422,9 @@ if __name__ == '__main__':
     print("   - Unsplash (50 requests/hour)")
     print("📌 Pinterest: Coming soon!")
     print("="*50 + "\n")
+    
+    # With debug=True the reloader runs this file in a parent and a child
+    # process - only the child (which serves requests) should start scoring
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_scoring()
     app.run(debug=True, port=5000)
\ No newline at end of file
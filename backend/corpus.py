@@ -0,0 +1,310 @@
+import json
+import math
+from array import array
+from collections.abc import Mapping, Sequence
+
+# Sentinel for missing timestamps / counts in the integer arrays
+MISSING = -1
+
+# How much of the file iter_json_array() reads at a time
+READ_CHUNK_SIZE = 1 << 20
+
+
+class CompactCorpus:
+    """
+    Memory-compact store for cafes and their reviews.
+
+    Instead of one dict per review, ratings and timestamps live in typed
+    arrays, author names and aspect keywords are interned, all review text
+    is one UTF-8 buffer, and each review's keyword hits are small integer
+    codes (plus how often each keyword appears) in shared arrays, with
+    offsets marking where each review starts.
+
+    corpus[i] / iteration give dict-like views, so code written for the
+    plain JSON (cafe['reviews'][0]['text'], cafe.get('rating'), ...)
+    keeps working.
+    """
+
+    def __init__(self, aspects):
+        # Keyword table: code -> (aspect, polarity, keyword)
+        self.keywords = []
+        for aspect_name, keywords in aspects.items():
+            for polarity in ('positive', 'negative'):
+                for keyword in keywords[polarity]:
+                    self.keywords.append((aspect_name, polarity, keyword))
+
+        # Cafes
+        self.uids = []
+        self.names = []
+        self.addresses = []
+        self.lats = array('d')
+        self.lngs = array('d')
+        self.cafe_ratings = array('d')
+        self.total_ratings = array('i')
+        self.review_offsets = array('I', [0])  # cafe i's reviews are [offsets[i], offsets[i+1])
+
+        # Reviews
+        self.authors = []     # interned author names
+        self._author_ids = {}
+        self.review_authors = array('I')
+        self.review_ratings = array('f')
+        self.review_times = array('q')
+        self.text_buffer = bytearray()
+        self.text_offsets = array('I', [0])  # review j's text is text_buffer[offsets[j]:offsets[j+1]]
+        self.hit_codes = array('H')
+        self.hit_counts = array('H')  # how many times each hit's keyword appears
+        self.hit_offsets = array('I', [0])  # review j's hits are hit_codes[offsets[j]:offsets[j+1]]
+
+    @classmethod
+    def load(cls, path, aspects):
+        """
+        Build a corpus from a JSON file with a list of cafes, reading one
+        cafe at a time so the whole file is never in memory as dicts
+        """
+        return cls.from_cafes(iter_json_array(path), aspects)
+
+    @classmethod
+    def from_cafes(cls, cafes, aspects):
+        """Build a corpus from a list of cafe dicts (e.g. northeastern_cafes.json)"""
+        corpus = cls(aspects)
+        for cafe in cafes:
+            corpus.add_cafe(cafe)
+        return corpus
+
+    def _intern_author(self, author):
+        author_id = self._author_ids.get(author)
+        if author_id is None:
+            author_id = len(self.authors)
+            self.authors.append(author)
+            self._author_ids[author] = author_id
+        return author_id
+
+    def add_cafe(self, cafe):
+        """Append one cafe (and its reviews) to the corpus"""
+        self.uids.append(cafe.get('uid'))
+        self.names.append(cafe.get('name'))
+        self.addresses.append(cafe.get('address'))
+        self.lats.append(_float_or_nan(cafe.get('lat')))
+        self.lngs.append(_float_or_nan(cafe.get('lng')))
+        self.cafe_ratings.append(_float_or_nan(cafe.get('rating')))
+        self.total_ratings.append(_int_or_missing(cafe.get('total_ratings')))
+
+        for review in cafe.get('reviews', []):
+            self._add_review(review)
+
+        self.review_offsets.append(len(self.review_times))
+
+    def _add_review(self, review):
+        text = review.get('text') or ''
+        review_time = review.get('time')
+
+        self.review_authors.append(self._intern_author(review.get('author')))
+        self.review_ratings.append(_float_or_nan(review.get('rating')))
+        self.review_times.append(_int_or_missing(review_time))
+        self.text_buffer += text.encode('utf-8')
+        self.text_offsets.append(len(self.text_buffer))
+
+        # Which aspect keywords the review mentions, and how often
+        text_lower = text.lower()
+        for code, (_, _, keyword) in enumerate(self.keywords):
+            hits = text_lower.count(keyword)
+            if hits:
+                self.hit_codes.append(code)
+                self.hit_counts.append(min(hits, 0xFFFF))
+        self.hit_offsets.append(len(self.hit_codes))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('cafe index out of range')
+        return CafeView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield CafeView(self, index)
+
+    def text(self, review_index):
+        start, end = self.text_offsets[review_index], self.text_offsets[review_index + 1]
+        return self.text_buffer[start:end].decode('utf-8')
+
+    def aspect_counts(self, cafe_index):
+        """Total {aspect: [positive, negative]} keyword counts over a cafe's reviews"""
+        counts = {aspect_name: [0, 0] for aspect_name, _, _ in self.keywords}
+        first_review, end_review = self.review_offsets[cafe_index], self.review_offsets[cafe_index + 1]
+        start, end = self.hit_offsets[first_review], self.hit_offsets[end_review]
+
+        for code, hits in zip(self.hit_codes[start:end], self.hit_counts[start:end]):
+            aspect_name, polarity, _ = self.keywords[code]
+            counts[aspect_name][0 if polarity == 'positive' else 1] += hits
+
+        return counts
+
+    def aspect_mentions(self, review_index):
+        """Rebuild a review's {aspect: {'positive': [...], 'negative': [...]}} dict"""
+        mentions = {}
+        start, end = self.hit_offsets[review_index], self.hit_offsets[review_index + 1]
+
+        for code in self.hit_codes[start:end]:
+            aspect_name, polarity, keyword = self.keywords[code]
+            aspect_mentions = mentions.setdefault(aspect_name, {'positive': [], 'negative': []})
+            aspect_mentions[polarity].append(keyword)
+
+        return mentions
+
+
+class CafeView(Mapping):
+    """Read-only dict-like view of one cafe in a CompactCorpus"""
+
+    KEYS = ('uid', 'name', 'address', 'lat', 'lng', 'rating', 'total_ratings', 'reviews')
+
+    def __init__(self, corpus, index):
+        self.corpus = corpus
+        self.index = index
+
+    def __getitem__(self, key):
+        corpus, i = self.corpus, self.index
+
+        if key == 'uid':
+            return corpus.uids[i]
+        if key == 'name':
+            return corpus.names[i]
+        if key == 'address':
+            return corpus.addresses[i]
+        if key == 'lat':
+            return _nan_to_none(corpus.lats[i])
+        if key == 'lng':
+            return _nan_to_none(corpus.lngs[i])
+        if key == 'rating':
+            return _nan_to_none(corpus.cafe_ratings[i])
+        if key == 'total_ratings':
+            total = corpus.total_ratings[i]
+            return total if total != MISSING else None
+        if key == 'reviews':
+            return ReviewsView(corpus, corpus.review_offsets[i], corpus.review_offsets[i + 1])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+
+class ReviewsView(Sequence):
+    """List-like view of one cafe's reviews"""
+
+    def __init__(self, corpus, start, end):
+        self.corpus = corpus
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('review index out of range')
+        return ReviewView(self.corpus, self.start + index)
+
+
+class ReviewView(Mapping):
+    """Read-only dict-like view of one review, including its aspect_mentions"""
+
+    KEYS = ('author', 'rating', 'text', 'time', 'aspect_mentions')
+
+    def __init__(self, corpus, index):
+        self.corpus = corpus
+        self.index = index
+
+    def __getitem__(self, key):
+        corpus, i = self.corpus, self.index
+
+        if key == 'author':
+            return corpus.authors[corpus.review_authors[i]]
+        if key == 'rating':
+            rating = _nan_to_none(corpus.review_ratings[i])
+            # Ratings are stored as float32 - give back whole stars as ints
+            if rating is not None and rating.is_integer():
+                return int(rating)
+            return round(rating, 2) if rating is not None else None
+        if key == 'text':
+            return corpus.text(i)
+        if key == 'time':
+            review_time = corpus.review_times[i]
+            return review_time if review_time != MISSING else None
+        if key == 'aspect_mentions':
+            return corpus.aspect_mentions(i)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+
+def iter_json_array(path):
+    """Yield the items of a JSON file holding one top-level list, one at a time"""
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace, the opening '[' and the commas between items
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','
+                                         or (buffer[pos] == '[' and not started)):
+                started = started or buffer[pos] == '['
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Item continues past the end of the buffer
+                    if eof:
+                        raise
+                else:
+                    yield item
+                    pos = end
+                    continue
+
+            if eof:
+                if started:
+                    raise ValueError(f"{path}: unexpected end of JSON list")
+                return
+
+            # Drop what's been parsed and read more
+            chunk = f.read(READ_CHUNK_SIZE)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+
+
+def _int_or_missing(value):
+    # Floats (e.g. a time of 1.5) are truncated - the arrays only hold ints
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return MISSING
+    return int(value)
+
+
+def _float_or_nan(value):
+    return float(value) if value is not None else math.nan
+
+
+def _nan_to_none(value):
+    return None if math.isnan(value) else value
@@ -4,6 +4,7 @@ import time
 
 import os
 from dotenv import load_dotenv
+from entity_resolution import CafeIdMap
 
 load_dotenv()
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
@@ -71,6 +72,7 @@ for i, cafe in enumerate(cafes, 1):
     
     if details:
         cafe_info = {
+            'place_id': cafe['place_id'],
             'name': details.get('name'),
             'address': details.get('formatted_address'),
             'lat': details['geometry']['location']['lat'],
@@ -98,6 +100,11 @@ for i, cafe in enumerate(cafes, 1):
     # Be nice to the API - wait between requests
     time.sleep(0.5)
 
+# Link to the same cafes from OpenStreetMap/Foursquare (adds a 'uid' to each cafe)
+id_map = CafeIdMap()
+all_cafe_data = id_map.resolve_cafes('google', all_cafe_data, id_key='place_id')
+id_map.save()
+
 # Save to file
 with open('northeastern_cafes.json', 'w') as f:
     json.dump(all_cafe_data, f, indent=2)
@@ -0,0 +1,397 @@
+import json
+import math
+import os
+import re
+import secrets
+import threading
+import unicodedata
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+
+try:
+    import fcntl
+except ImportError:  # Windows - no cross-process locking
+    fcntl = None
+
+# Where the cross-source ID map is saved between runs (JSON lines)
+ID_MAP_FILE = 'cafe_id_map.jsonl'
+# Slack before the journal is compacted: it's rewritten once it has more
+# than 2 lines per place plus this many
+COMPACT_MIN_LINES = 1000
+
+# Geohash precision 7 = 35 bits (18 for longitude, 17 for latitude),
+# which gives cells of roughly 150m x 110m around Boston
+GEOHASH_PRECISION = 7
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+LNG_BITS = (GEOHASH_PRECISION * 5 + 1) // 2
+LAT_BITS = (GEOHASH_PRECISION * 5) // 2
+
+# Cell size in meters (width is at the equator - it shrinks with cos(lat))
+CELL_HEIGHT_M = 180.0 / (1 << LAT_BITS) * 111320
+CELL_WIDTH_M = 360.0 / (1 << LNG_BITS) * 111320
+
+# Two candidates must be this close (meters) to be the same cafe.
+# find_match() searches as many cells around the candidate as this covers.
+MATCH_RADIUS_M = 100
+# Minimum name similarity (0-1) for two nearby candidates to match
+NAME_THRESHOLD = 0.6
+
+# Words that don't help tell cafes apart
+NAME_STOPWORDS = {'the', 'a', 'an', 'and', 'of', 'cafe', 'caffe', 'coffee', 'coffeehouse',
+                  'shop', 'house', 'bar', 'co', 'company', 'roasters', 'espresso', 'boston'}
+
+
+def geohash_cell(lat, lng):
+    """Get the (lat, lng) integer cell indices for a location"""
+    lat_idx = int((lat + 90.0) / 180.0 * (1 << LAT_BITS))
+    lng_idx = int((lng + 180.0) / 360.0 * (1 << LNG_BITS))
+
+    # Clamp the poles / antimeridian into the last cell
+    lat_idx = min(max(lat_idx, 0), (1 << LAT_BITS) - 1)
+    lng_idx = min(max(lng_idx, 0), (1 << LNG_BITS) - 1)
+
+    return lat_idx, lng_idx
+
+
+def encode_geohash(lat, lng):
+    """Encode a location as a standard geohash string"""
+    lat_idx, lng_idx = geohash_cell(lat, lng)
+
+    # Geohash interleaves the bits, starting with longitude
+    bits = 0
+    for k in range(LNG_BITS + LAT_BITS):
+        if k % 2 == 0:
+            bits = (bits << 1) | ((lng_idx >> (LNG_BITS - 1 - k // 2)) & 1)
+        else:
+            bits = (bits << 1) | ((lat_idx >> (LAT_BITS - 1 - k // 2)) & 1)
+
+    chars = []
+    for i in range(GEOHASH_PRECISION - 1, -1, -1):
+        chars.append(GEOHASH_BASE32[(bits >> (i * 5)) & 31])
+
+    return ''.join(chars)
+
+
+def normalize_name(name):
+    """Lowercase, strip accents/punctuation and drop generic words like 'cafe'"""
+    if not name:
+        return ''
+
+    text = name
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace('&', ' and ').replace("'", '')
+    tokens = re.findall(r'[a-z0-9]+', text)
+
+    kept = [t for t in tokens if t not in NAME_STOPWORDS]
+
+    # Names like "The Coffee Shop" are all stopwords - keep them as they are
+    return ' '.join(kept if kept else tokens)
+
+
+def name_similarity(a, b):
+    """Compare two normalized names (0 = different, 1 = same)"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+
+    tokens_a = set(a.split())
+    tokens_b = set(b.split())
+
+    # "tatte" vs "tatte bakery" - one name contains the other
+    if tokens_a <= tokens_b or tokens_b <= tokens_a:
+        return 0.9
+
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    return max(jaccard, SequenceMatcher(None, a, b).ratio())
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """Approximate distance in meters (equirectangular, fine at cafe scale)"""
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371000 * math.hypot(x, y)
+
+
+class CafeIdMap:
+    """
+    Links the same cafe across OpenStreetMap, Foursquare and Google.
+
+    Places are bucketed by geohash cell, so a new candidate is only
+    compared against places in the cells within MATCH_RADIUS_M of it.
+
+    The map is saved as a JSON-lines journal: save() only appends the
+    places and source links added since the last save, and the file is
+    rewritten as one line per place once the journal gets too long.
+
+    Several processes (the API, data_extraction.py) can share the same
+    file: saves hold a lock file and first replay whatever the other
+    processes appended (or reload if one of them compacted the file).
+    Safe to share between threads (e.g. Flask request handlers).
+    """
+
+    def __init__(self, path=ID_MAP_FILE):
+        self.path = path
+        self.places = {}    # uid -> {'name', 'lat', 'lng', 'geohash', 'sources'}
+        self.by_source = {}  # (source, source_id) -> uid
+        self.buckets = {}   # (lat_idx, lng_idx) -> [uid, ...]
+        self._names = {}    # uid -> normalized name
+        self._pending = []  # journal entries not saved yet
+        self._journal_lines = 0
+        self._offset = 0    # how far into the journal we've read (bytes)
+        self._inode = None  # changes when another process compacts the file
+        self.lock = threading.RLock()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def _reset(self):
+        self.places = {}
+        self.by_source = {}
+        self.buckets = {}
+        self._names = {}
+        self._journal_lines = 0
+        self._offset = 0
+        self._inode = None
+
+    @contextmanager
+    def _file_lock(self):
+        """Lock out other processes while reading/writing the journal"""
+        with open(self.path + '.lock', 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """Load a previously saved map by replaying its journal"""
+        with self.lock, self._file_lock():
+            self._reset()
+            self._catch_up()
+
+    def refresh(self):
+        """Pick up places/links other processes have saved since we last looked"""
+        if not self.path:
+            return
+        with self.lock, self._file_lock():
+            self._catch_up()
+
+    def _catch_up(self):
+        """Replay journal lines written since the last read (caller holds the locks)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._offset):
+            # Someone else compacted (or replaced) the journal - start over,
+            # then put back our own unsaved changes
+            self._reset()
+            self._replay_file()
+            for entry in self._pending:
+                self._apply(entry)
+        else:
+            self._replay_file()
+
+    def _replay_file(self):
+        with open(self.path, 'rb') as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            f.seek(self._offset)
+
+            for line in f:
+                # A line without a newline is still being written
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+
+                if line.strip():
+                    self._apply(json.loads(line))
+                    self._journal_lines += 1
+
+    def _apply(self, entry):
+        if 'place' in entry:
+            if entry['uid'] not in self.places:
+                place = dict(entry['place'])
+                place['sources'] = dict(place.get('sources', {}))
+                self._index(entry['uid'], place)
+        elif entry['uid'] in self.places:
+            self._link(entry['uid'], entry['source'], entry['source_id'])
+
+    def save(self):
+        """Append unsaved changes to the journal (compacting it when it gets long)"""
+        if not self.path:
+            return
+
+        with self.lock, self._file_lock():
+            self._catch_up()
+            if not self._pending:
+                return
+
+            if self._journal_lines + len(self._pending) > 2 * len(self.places) + COMPACT_MIN_LINES:
+                self._compact()
+                return
+
+            with open(self.path, 'ab') as f:
+                for entry in self._pending:
+                    line = (json.dumps(entry) + '\n').encode()
+                    f.write(line)
+                    self._offset += len(line)
+                self._inode = os.fstat(f.fileno()).st_ino
+
+            self._journal_lines += len(self._pending)
+            self._pending = []
+
+    def _compact(self):
+        """Rewrite the journal as one line per place (caller holds the locks)"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for uid, place in self.places.items():
+                f.write((json.dumps({'uid': uid, 'place': place}) + '\n').encode())
+            self._offset = f.tell()
+        os.replace(tmp_path, self.path)
+
+        self._inode = os.stat(self.path).st_ino
+        self._journal_lines = len(self.places)
+        self._pending = []
+
+    def _index(self, uid, place, norm=None):
+        self.places[uid] = place
+        self._names[uid] = norm if norm is not None else normalize_name(place['name'])
+        self.buckets.setdefault(geohash_cell(place['lat'], place['lng']), []).append(uid)
+
+        for source, source_id in place['sources'].items():
+            self.by_source[(source, str(source_id))] = uid
+
+    def _link(self, uid, source, source_id):
+        key = (source, str(source_id))
+
+        # A source ID belongs to one place - the latest link wins
+        old_uid = self.by_source.get(key)
+        if old_uid and old_uid != uid and self.places[old_uid]['sources'].get(source) == key[1]:
+            del self.places[old_uid]['sources'][source]
+
+        self.places[uid]['sources'][source] = key[1]
+        self.by_source[key] = uid
+
+    def find_match(self, name, lat, lng, source=None, norm=None):
+        """Find the uid of an existing place matching this name/location, or None"""
+        if norm is None:
+            norm = normalize_name(name)
+        lat_idx, lng_idx = geohash_cell(lat, lng)
+
+        # How many cells MATCH_RADIUS_M spans - cells get narrower away from the equator
+        lat_reach = math.ceil(MATCH_RADIUS_M / CELL_HEIGHT_M)
+        lng_reach = math.ceil(MATCH_RADIUS_M / (CELL_WIDTH_M * max(math.cos(math.radians(lat)), 0.01)))
+
+        best_uid = None
+        best_score = 0.0
+
+        for d_lat in range(-lat_reach, lat_reach + 1):
+            for d_lng in range(-lng_reach, lng_reach + 1):
+                for uid in self.buckets.get((lat_idx + d_lat, lng_idx + d_lng), ()):
+                    place = self.places[uid]
+
+                    # A place only gets one ID per source
+                    if source and source in place['sources']:
+                        continue
+
+                    dist = distance_m(lat, lng, place['lat'], place['lng'])
+                    if dist > MATCH_RADIUS_M:
+                        continue
+
+                    similarity = name_similarity(norm, self._names[uid])
+                    if similarity < NAME_THRESHOLD:
+                        continue
+
+                    # Prefer similar names, break ties by distance
+                    score = similarity - dist / (MATCH_RADIUS_M * 10)
+                    if score > best_score:
+                        best_uid = uid
+                        best_score = score
+
+        return best_uid
+
+    def resolve(self, source, source_id, name, lat, lng):
+        """
+        Get the cross-source uid for a cafe, adding it to the map if needed.
+
+        source is e.g. 'osm', 'foursquare' or 'google'. source_id can be
+        None when the source has no stable ID (then it's matched by name
+        and location only).
+        """
+        with self.lock:
+            if source_id is not None:
+                uid = self.by_source.get((source, str(source_id)))
+                if uid:
+                    return uid
+
+            if lat is None or lng is None:
+                return None
+
+            norm = normalize_name(name)
+            uid = self.find_match(name, lat, lng, source if source_id is not None else None, norm=norm)
+
+            if uid is None:
+                geohash = encode_geohash(lat, lng)
+                # Random suffix so processes sharing the journal can't hand out the same uid
+                uid = f"{geohash}-{secrets.token_hex(4)}"
+                while uid in self.places:
+                    uid = f"{geohash}-{secrets.token_hex(4)}"
+                place = {
+                    'name': name,
+                    'lat': lat,
+                    'lng': lng,
+                    'geohash': geohash,
+                    'sources': {}
+                }
+                self._index(uid, place, norm=norm)
+                self._pending.append({'uid': uid, 'place': dict(place, sources={})})
+
+            if source_id is not None:
+                self._link(uid, source, source_id)
+                self._pending.append({'uid': uid, 'source': source, 'source_id': str(source_id)})
+
+            return uid
+
+    def resolve_cafes(self, source, cafes, id_key='id'):
+        """
+        Add a 'uid' to each cafe dict and drop duplicates of the same place.
+        Returns the de-duplicated list.
+        """
+        seen = set()
+        unique = []
+
+        with self.lock:
+            # Other processes may have linked some of these since we loaded
+            self.refresh()
+
+            for cafe in cafes:
+                uid = self.resolve(source, cafe.get(id_key), cafe.get('name'), cafe.get('lat'), cafe.get('lng'))
+                if uid is not None:
+                    if uid in seen:
+                        continue
+                    seen.add(uid)
+
+                cafe['uid'] = uid
+                unique.append(cafe)
+
+        return unique
+
+
+if __name__ == '__main__':
+    # Build/refresh the map from the saved Google data
+    id_map = CafeIdMap()
+
+    with open('northeastern_cafes.json', 'r') as f:
+        cafes = json.load(f)
+
+    resolved = id_map.resolve_cafes('google', cafes, id_key='place_id')
+    id_map.save()
+
+    print(f"✓ Resolved {len(cafes)} cafes to {len(resolved)} places")
+    print(f"✓ {len(id_map.places)} places in {ID_MAP_FILE}")
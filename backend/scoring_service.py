@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+from analyze import aspects, calculate_studyability, score_aspect
+
+# How much older mentions count for: a mention loses half its weight
+# after this many days. None = no decay (same as analyze.py).
+DEFAULT_HALF_LIFE_DAYS = None
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class StudyabilityScorer:
+    """
+    Keeps per-aspect positive/negative counters for each cafe and
+    updates that cafe's studyability score as new reviews come in.
+
+    Each counter stores (value, time of last update) and decay is only
+    applied when the counter is touched, so there are no periodic sweeps.
+    """
+
+    def __init__(self, half_life_days=DEFAULT_HALF_LIFE_DAYS):
+        self.half_life = half_life_days * SECONDS_PER_DAY if half_life_days else None
+        self.counters = {}        # cafe_id -> {(aspect, polarity): [value, time]}
+        self.google_ratings = {}  # cafe_id -> rating
+        self.last_time = {}       # cafe_id -> time of the latest review
+        self.scores = {}          # cafe_id -> latest published result
+        self.lock = threading.Lock()
+
+        # Flatten the keyword lists once
+        self.keywords = []
+        for aspect_name, keywords in aspects.items():
+            for polarity in ('positive', 'negative'):
+                for keyword in keywords[polarity]:
+                    self.keywords.append((keyword, aspect_name, polarity))
+
+    def _decayed(self, counter, now):
+        """Value of a [value, time] counter as of `now`"""
+        value, last = counter
+        if self.half_life is None or now is None or last is None or now <= last:
+            return value
+        return value * 0.5 ** ((now - last) / self.half_life)
+
+    def _aspect_scores(self, cafe_id, now):
+        """Score each aspect from its (decayed) counters, like analyze.py does"""
+        counters = self.counters.get(cafe_id, {})
+        scores = {}
+
+        for aspect_name in aspects:
+            positive = negative = 0
+            if (aspect_name, 'positive') in counters:
+                positive = self._decayed(counters[(aspect_name, 'positive')], now)
+            if (aspect_name, 'negative') in counters:
+                negative = self._decayed(counters[(aspect_name, 'negative')], now)
+
+            scores[aspect_name] = score_aspect(positive, negative)
+
+        return scores
+
+    def add_review(self, cafe_id, review, google_rating=None):
+        """
+        Count one review's keyword mentions and rescore that cafe.
+        Returns the new score dict.
+        """
+        text = (review.get('text') or '').lower()
+        review_time = review.get('time')
+
+        # A NaN/inf or far-future time would become the cafe's "now" for good
+        # and decay every later review to nothing
+        if review_time is not None and not math.isfinite(review_time):
+            review_time = None
+        elif review_time is not None:
+            review_time = min(review_time, time.time())
+
+        with self.lock:
+            if google_rating is not None:
+                self.google_ratings[cafe_id] = google_rating
+
+            # Undated reviews count as of the cafe's latest review
+            if review_time is None:
+                review_time = self.last_time.get(cafe_id)
+
+            cafe_counters = self.counters.setdefault(cafe_id, {})
+
+            # Only the counters for keywords that were hit get updated
+            for keyword, aspect_name, polarity in self.keywords:
+                hits = text.count(keyword)
+                if not hits:
+                    continue
+
+                counter = cafe_counters.get((aspect_name, polarity))
+                if counter is None:
+                    cafe_counters[(aspect_name, polarity)] = [hits, review_time]
+                elif counter[1] is None:
+                    # Only undated reviews so far - start decaying from this one
+                    counter[0] += hits
+                    counter[1] = review_time
+                elif review_time is None or review_time <= counter[1]:
+                    # Older (or undated) review - decay it to the counter's time instead
+                    counter[0] += self._decayed([hits, review_time], counter[1])
+                else:
+                    counter[0] = self._decayed(counter, review_time) + hits
+                    counter[1] = review_time
+
+            if review_time is not None:
+                self.last_time[cafe_id] = max(review_time, self.last_time.get(cafe_id, review_time))
+
+            return self._rescore(cafe_id)
+
+    def _rescore(self, cafe_id):
+        now = self.last_time.get(cafe_id)
+        aspect_scores = self._aspect_scores(cafe_id, now)
+        studyability = calculate_studyability(aspect_scores, self.google_ratings.get(cafe_id))
+
+        result = {
+            'cafe_id': cafe_id,
+            'studyability_score': float(studyability) if studyability is not None else None,
+            'aspect_scores': aspect_scores,
+            'google_rating': self.google_ratings.get(cafe_id),
+            'as_of': now
+        }
+        self.scores[cafe_id] = result
+        return result
+
+    def get_score(self, cafe_id):
+        with self.lock:
+            return self.scores.get(cafe_id)
+
+    def load_cafes(self, cafes):
+        """Seed the counters from saved cafe data (e.g. northeastern_cafes.json)"""
+        for cafe in cafes:
+            # Fall back to the name only when there's no ID at all -
+            # chains have several branches with the same name
+            cafe_id = cafe.get('uid') or cafe.get('place_id') or cafe['name']
+            self.google_ratings[cafe_id] = cafe.get('rating')
+
+            for review in sorted(cafe.get('reviews', []), key=lambda r: r.get('time') or 0):
+                self.add_review(cafe_id, review)
+
+            # Cafes without reviews still get a rating-only score
+            if cafe_id not in self.scores:
+                with self.lock:
+                    self._rescore(cafe_id)
+
+
+class ScoringService:
+    """
+    Long-running wrapper around StudyabilityScorer.
+
+    Review events are put on a queue (directly, from an HTTP POST or by
+    tailing a JSON-lines file) and a worker thread scores them one by one.
+    Each new score is passed to the `on_score` callbacks.
+    """
+
+    def __init__(self, scorer=None, on_score=None):
+        self.scorer = scorer or StudyabilityScorer()
+        self.events = queue.Queue()
+        self.on_score = [on_score] if on_score else []
+        self.running = False
+
+    def submit(self, event):
+        """Queue a review event: {'cafe_id', 'author', 'rating', 'text', 'time', 'google_rating'?}"""
+        self.events.put(event)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        self.events.put(None)
+
+    def _worker(self):
+        while self.running:
+            event = self.events.get()
+            if event is None:
+                break
+
+            try:
+                result = self.scorer.add_review(event['cafe_id'], event, event.get('google_rating'))
+                for callback in self.on_score:
+                    callback(result)
+            except Exception as e:
+                print(f"Error scoring review event: {e}")
+
+    def tail_file(self, path, poll_interval=1.0):
+        """Follow a JSON-lines file of review events in a background thread"""
+        def follow():
+            # Wait for the file to be created
+            while self.running and not os.path.exists(path):
+                time.sleep(poll_interval)
+            if not self.running:
+                return
+
+            with open(path, 'r') as f:
+                f.seek(0, os.SEEK_END)
+                partial = ''
+                while self.running:
+                    line = f.readline()
+                    if not line:
+                        time.sleep(poll_interval)
+                        continue
+
+                    # Don't parse a line that's still being written
+                    partial += line
+                    if not partial.endswith('\n'):
+                        continue
+
+                    if partial.strip():
+                        try:
+                            self.submit(json.loads(partial))
+                        except json.JSONDecodeError as e:
+                            print(f"Skipping bad review event: {e}")
+                    partial = ''
+
+        threading.Thread(target=follow, daemon=True).start()
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python scoring_service.py review_events.jsonl
+    events_file = sys.argv[1] if len(sys.argv) > 1 else 'review_events.jsonl'
+
+    scorer = StudyabilityScorer()
+    with open('northeastern_cafes.json', 'r') as f:
+        scorer.load_cafes(json.load(f))
+
+    def print_score(result):
+        print(f"{result['cafe_id']}: {result['studyability_score']}/10")
+
+    service = ScoringService(scorer, on_score=print_score)
+    service.start()
+    service.tail_file(events_file)
+
+    print(f"Scoring review events from {events_file} (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        service.stop()
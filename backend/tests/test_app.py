@@ -0,0 +1,55 @@
+import pytest
+
+flask = pytest.importorskip('flask')
+
+import app as app_module
+from entity_resolution import CafeIdMap
+from scoring_service import ScoringService, StudyabilityScorer
+
+
+@pytest.fixture
+def client(monkeypatch):
+    scorer = StudyabilityScorer()
+    scorer.load_cafes([{'uid': 'known', 'name': 'Tatte', 'rating': 4.5, 'reviews': []}])
+    service = ScoringService(scorer)
+
+    monkeypatch.setattr(app_module, 'scorer', scorer)
+    monkeypatch.setattr(app_module, 'scoring_service', service)
+    monkeypatch.setattr(app_module, 'cafe_id_map', CafeIdMap(path=None))
+    return app_module.app.test_client(), service
+
+
+@pytest.mark.parametrize('body', [
+    {'cafe_id': 'known', 'text': 'quiet', 'time': 'yesterday'},
+    {'cafe_id': 'known', 'text': 'quiet', 'rating': True},
+    {'cafe_id': 'known'},
+])
+def test_add_review_rejects_bad_input(client, body):
+    test_client, service = client
+    assert test_client.post('/api/reviews', json=body).status_code == 400
+    assert service.events.empty()
+
+
+def test_add_review_rejects_non_finite_time(client):
+    test_client, service = client
+    response = test_client.post('/api/reviews', data='{"cafe_id": "known", "text": "quiet", "time": Infinity}',
+                                content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_add_review_unknown_cafe(client):
+    test_client, service = client
+    assert test_client.post('/api/reviews', json={'cafe_id': 'nope', 'text': 'quiet'}).status_code == 404
+
+
+def test_add_review_queues_event_without_google_rating(client):
+    test_client, service = client
+    response = test_client.post('/api/reviews', json={
+        'cafe_id': 'known', 'text': 'quiet', 'time': 1e12, 'google_rating': 1.0
+    })
+
+    assert response.status_code == 202
+    event = service.events.get_nowait()
+    assert 'google_rating' not in event
+    # Future times are clamped to now
+    assert event['time'] < 1e12
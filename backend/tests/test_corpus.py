@@ -0,0 +1,61 @@
+import json
+
+import corpus
+from analyze import aspects
+from corpus import CompactCorpus, iter_json_array
+
+CAFES = [
+    {
+        'uid': 'u1', 'name': 'Tatte', 'address': '1 Main St', 'lat': 42.34, 'lng': -71.09,
+        'rating': 4.3, 'total_ratings': 120.0,
+        'reviews': [
+            {'author': 'Ann', 'rating': 5, 'text': 'Quiet, quiet and fast wifi ☕', 'time': 1700000000},
+            {'author': 'Ann', 'rating': 2, 'text': 'So loud today', 'time': 1.5},
+        ]
+    },
+    {'name': 'Empty', 'address': None, 'lat': None, 'lng': None, 'rating': None, 'reviews': []},
+]
+
+
+def test_views_match_input():
+    cafes = CompactCorpus.from_cafes(CAFES, aspects)
+
+    assert len(cafes) == 2
+    assert cafes[0]['name'] == 'Tatte'
+    assert cafes[0]['total_ratings'] == 120
+    assert cafes[1]['lat'] is None and cafes[1]['total_ratings'] is None
+
+    review = cafes[0]['reviews'][0]
+    assert review['text'] == 'Quiet, quiet and fast wifi ☕'
+    assert review['author'] == 'Ann'
+    assert review['aspect_mentions'] == {
+        'noise': {'positive': ['quiet'], 'negative': []},
+        'wifi': {'positive': ['fast wifi'], 'negative': []},
+    }
+    # Float times are truncated instead of failing the load
+    assert cafes[0]['reviews'][1]['time'] == 1
+
+
+def test_aspect_counts_count_every_mention():
+    cafes = CompactCorpus.from_cafes(CAFES, aspects)
+    counts = cafes.aspect_counts(0)
+
+    assert counts['noise'] == [2, 1]
+    assert counts['wifi'] == [1, 0]
+    assert cafes.aspect_counts(1)['noise'] == [0, 0]
+
+
+def test_load_streams_json_file(tmp_path, monkeypatch):
+    # Small chunks so items span several reads
+    monkeypatch.setattr(corpus, 'READ_CHUNK_SIZE', 7)
+    path = tmp_path / 'cafes.json'
+    path.write_text(json.dumps(CAFES, indent=2), encoding='utf-8')
+
+    assert list(iter_json_array(str(path))) == CAFES
+    assert CompactCorpus.load(str(path), aspects)[0]['reviews'][0]['text'] == CAFES[0]['reviews'][0]['text']
+
+
+def test_iter_json_array_empty_list(tmp_path):
+    path = tmp_path / 'cafes.json'
+    path.write_text('[]')
+    assert list(iter_json_array(str(path))) == []
@@ -0,0 +1,98 @@
+import json
+
+import entity_resolution
+from entity_resolution import CafeIdMap, encode_geohash, name_similarity, normalize_name, NAME_THRESHOLD
+
+
+def test_encode_geohash_known_values():
+    assert encode_geohash(57.64911, 10.40744) == 'u4pruyd'
+    assert encode_geohash(42.3398, -71.0892) == 'drt2y7d'
+
+
+def test_normalize_name_drops_generic_words():
+    assert normalize_name('Café Nero') == 'nero'
+    # All generic words - kept as they are
+    assert normalize_name('The Coffee Shop') == 'the coffee shop'
+    assert normalize_name('Tatte Bakery & Cafe') == 'tatte bakery'
+    assert normalize_name("Pavement Coffeehouse") == 'pavement'
+
+
+def test_name_similarity_thresholds():
+    assert name_similarity('tatte', 'tatte bakery') >= NAME_THRESHOLD
+    assert name_similarity(normalize_name("Dunkin'"), normalize_name('Dunkin')) == 1.0
+    assert name_similarity('starbucks', 'tatte bakery') < NAME_THRESHOLD
+    assert name_similarity('', 'tatte') == 0.0
+
+
+def test_resolve_matches_across_sources():
+    id_map = CafeIdMap(path=None)
+    osm = id_map.resolve('osm', '1', 'Tatte Bakery & Cafe', 42.3401, -71.0890)
+    fsq = id_map.resolve('foursquare', 'x', 'Tatte Bakery', 42.3402, -71.0891)
+    other = id_map.resolve('google', 'g', 'Starbucks', 42.3402, -71.0891)
+
+    assert osm == fsq
+    assert other != osm
+    assert id_map.places[osm]['sources'] == {'osm': '1', 'foursquare': 'x'}
+    # Known source IDs resolve without matching again
+    assert id_map.resolve('osm', '1', 'Renamed', 0, 0) == osm
+
+
+def test_resolve_matches_at_high_latitude():
+    # ~82m apart in longitude at 64N spans more than one (narrow) cell
+    id_map = CafeIdMap(path=None)
+    a = id_map.resolve('osm', '1', 'Kaffi', 64.1466, -21.9426)
+    b = id_map.resolve('google', 'g', 'Kaffi', 64.1466, -21.9443)
+    assert a == b
+
+
+def test_journal_round_trip(tmp_path):
+    path = str(tmp_path / 'map.jsonl')
+    id_map = CafeIdMap(path)
+    uid = id_map.resolve('osm', '1', 'Tatte', 42.34, -71.09)
+    id_map.save()
+    id_map.resolve('google', 'g1', 'Tatte', 42.34, -71.09)
+    id_map.save()
+
+    # Only appended lines: place, osm link, google link
+    with open(path) as f:
+        assert len(f.readlines()) == 3
+
+    reloaded = CafeIdMap(path)
+    assert reloaded.places[uid]['sources'] == {'osm': '1', 'google': 'g1'}
+    assert reloaded.by_source[('google', 'g1')] == uid
+
+
+def test_compaction_rewrites_one_line_per_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(entity_resolution, 'COMPACT_MIN_LINES', 0)
+    path = str(tmp_path / 'map.jsonl')
+    id_map = CafeIdMap(path)
+    uid = id_map.resolve('osm', '1', 'Tatte', 42.34, -71.09)
+    id_map.resolve('google', 'g1', 'Tatte', 42.34, -71.09)
+    id_map.save()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'uid': uid, 'place': id_map.places[uid]}]
+    assert CafeIdMap(path).places == id_map.places
+
+
+def test_shared_journal_keeps_other_writers_links(tmp_path, monkeypatch):
+    path = str(tmp_path / 'map.jsonl')
+    api = CafeIdMap(path)
+    extraction = CafeIdMap(path)
+
+    google_uid = extraction.resolve('google', 'g1', 'Tatte', 42.34, -71.09)
+    extraction.save()
+
+    # The API hasn't reloaded, but saving (even a compaction) must keep the Google link
+    monkeypatch.setattr(entity_resolution, 'COMPACT_MIN_LINES', 0)
+    osm_uid = api.resolve('osm', '1', 'Starbucks', 42.35, -71.08)
+    api.save()
+
+    reloaded = CafeIdMap(path)
+    assert reloaded.by_source[('google', 'g1')] == google_uid
+    assert reloaded.by_source[('osm', '1')] == osm_uid
+
+    # And the other process picks up the API's places when it refreshes
+    extraction.refresh()
+    assert extraction.by_source[('osm', '1')] == osm_uid
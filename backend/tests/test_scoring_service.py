@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from scoring_service import StudyabilityScorer
+
+DAY = 24 * 60 * 60
+
+
+def test_scores_match_keyword_ratio_without_decay():
+    scorer = StudyabilityScorer()
+    scorer.add_review('c1', {'text': 'Very quiet, fast wifi', 'time': 0}, google_rating=4.5)
+    result = scorer.add_review('c1', {'text': 'too loud', 'time': DAY})
+
+    assert result['aspect_scores']['noise'] == 5.0
+    assert result['aspect_scores']['wifi'] == 10.0
+    assert result['aspect_scores']['outlets'] is None
+
+
+def test_older_mentions_decay():
+    scorer = StudyabilityScorer(half_life_days=30)
+    scorer.add_review('c1', {'text': 'quiet', 'time': 0})
+    result = scorer.add_review('c1', {'text': 'loud and noisy', 'time': 60 * DAY})
+
+    # 1 positive at a quarter weight vs 2 fresh negatives
+    assert result['aspect_scores']['noise'] == pytest.approx(0.25 / 2.25 * 10, abs=0.05)
+
+
+def test_out_of_order_review_is_decayed_to_counter_time():
+    scorer = StudyabilityScorer(half_life_days=30)
+    scorer.add_review('c1', {'text': 'quiet', 'time': 0})
+    scorer.add_review('c1', {'text': 'loud and noisy', 'time': 60 * DAY})
+    result = scorer.add_review('c1', {'text': 'quiet', 'time': 30 * DAY})
+
+    assert result['as_of'] == 60 * DAY
+    assert result['aspect_scores']['noise'] == pytest.approx(0.75 / 2.75 * 10, abs=0.05)
+
+
+def test_counter_started_by_undated_review_still_decays():
+    scorer = StudyabilityScorer(half_life_days=1)
+    scorer.add_review('c1', {'text': 'quiet'})
+    scorer.add_review('c1', {'text': 'quiet', 'time': 10 * DAY})
+    result = scorer.add_review('c1', {'text': 'loud', 'time': 20 * DAY})
+
+    # The positives are 10 half-lives old by now
+    assert result['aspect_scores']['noise'] == 0.0
+
+
+def test_non_finite_and_future_times_dont_freeze_the_score():
+    scorer = StudyabilityScorer(half_life_days=1)
+    now = time.time()
+    scorer.add_review('c1', {'text': 'loud', 'time': now - DAY})
+    scorer.add_review('c1', {'text': 'loud', 'time': float('inf')})
+    scorer.add_review('c1', {'text': 'loud', 'time': now + 1000 * DAY})
+    result = scorer.add_review('c1', {'text': 'quiet quiet quiet', 'time': now})
+
+    assert result['as_of'] <= time.time()
+    assert result['aspect_scores']['noise'] > 0
+
+
+def test_load_cafes_keeps_chain_branches_apart():
+    scorer = StudyabilityScorer()
+    scorer.load_cafes([
+        {'place_id': 'a', 'name': 'Starbucks', 'rating': 4.0, 'reviews': [{'text': 'quiet', 'time': 1}]},
+        {'place_id': 'b', 'name': 'Starbucks', 'rating': 3.0, 'reviews': [{'text': 'loud', 'time': 1}]},
+    ])
+
+    assert scorer.get_score('a')['aspect_scores']['noise'] == 10.0
+    assert scorer.get_score('b')['aspect_scores']['noise'] == 0.0
@@ -1,40 +1,211 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import altair as alt
 
-# Load results
-df = pd.read_csv('cafe_studyability_scores.csv')
-
-# Remove rows with no studyability score
-df = df.dropna(subset=['studyability'])
-
-# Chart 1: Bar chart of top cafes
-bar = alt.Chart(df.head(10)).mark_bar().encode(
-    x=alt.X('studyability:Q', title='Studyability Score (0-10)', scale=alt.Scale(domain=[0, 10])),
-    y=alt.Y('name:N', sort='-x', title=''),
-    color=alt.Color('studyability:Q', scale=alt.Scale(scheme='redyellowgreen'), legend=None),
-    tooltip=['name', 'studyability', 'google_rating', 'noise', 'wifi', 'outlets']
-).properties(
-    title='Top 10 Study Spots Near Northeastern',
-    width=600,
-    height=400
-)
-
-bar.save('top_study_spots.html')
-print("✓ Saved top_study_spots.html")
-
-# Chart 2: Studyability vs Google Rating
-scatter = alt.Chart(df).mark_circle(size=100).encode(
-    x=alt.X('google_rating:Q', title='Google Rating', scale=alt.Scale(domain=[0, 5])),
-    y=alt.Y('studyability:Q', title='Studyability Score', scale=alt.Scale(domain=[0, 10])),
-    color=alt.Color('studyability:Q', scale=alt.Scale(scheme='redyellowgreen')),
-    tooltip=['name', 'studyability', 'google_rating']
-).properties(
-    title='Studyability vs Google Rating',
-    width=500,
-    height=400
-)
-
-scatter.save('studyability_vs_rating.html')
-print("✓ Saved studyability_vs_rating.html")
-
-print("\n🎨 Open the HTML files to see your visualizations!")
\ No newline at end of file
+from entity_resolution import distance_m
+
+SCORES_FILE = 'cafe_studyability_scores.csv'
+
+# All charts go here. The data is written once to data/cafes.json and
+# every chart references it by URL instead of embedding its own copy.
+CHARTS_DIR = 'charts'
+DATA_FILE = 'data/cafes.json'
+CACHE_FILE = os.path.join(CHARTS_DIR, '.chart_cache.json')
+
+# Regions to build charts for: center and radius (meters)
+REGIONS = {
+    'northeastern': {'title': 'Northeastern', 'lat': 42.3398, 'lng': -71.0892, 'radius': 2000},
+    'boston_university': {'title': 'Boston University', 'lat': 42.3505, 'lng': -71.1054, 'radius': 2000},
+    'mit': {'title': 'MIT', 'lat': 42.3601, 'lng': -71.0942, 'radius': 2000},
+    'harvard': {'title': 'Harvard', 'lat': 42.3770, 'lng': -71.1167, 'radius': 2000},
+}
+
+# Scores to make a "top 10" chart for
+ASPECT_TITLES = {
+    'studyability': 'Studyability',
+    'noise': 'Noise',
+    'wifi': 'WiFi',
+    'outlets': 'Outlets',
+    'seating': 'Seating',
+    'study_friendly': 'Study Friendly',
+    'atmosphere': 'Atmosphere',
+}
+
+COLUMNS = ['name', 'lat', 'lng', 'google_rating'] + list(ASPECT_TITLES)
+
+
+def load_records():
+    """Read the scores CSV and tag each cafe with the regions it falls in"""
+    df = pd.read_csv(SCORES_FILE)
+
+    # Remove rows with no studyability score
+    df = df.dropna(subset=['studyability'])
+
+    records = []
+    for row in df[COLUMNS].to_dict(orient='records'):
+        # NaN isn't valid JSON
+        record = {k: (None if isinstance(v, float) and pd.isna(v) else v) for k, v in row.items()}
+        # Cafes without coordinates are still in the data, just not in any region
+        record['regions'] = []
+        if record['lat'] is not None and record['lng'] is not None:
+            record['regions'] = [
+                region_id for region_id, region in REGIONS.items()
+                if distance_m(region['lat'], region['lng'], record['lat'], record['lng']) <= region['radius']
+            ]
+        records.append(record)
+
+    return records
+
+
+def spec_hash(chart):
+    """
+    Hash of a chart's Vega-Lite spec (and the Altair version that renders it).
+    The data lives in the shared data file, so this is all the HTML depends on.
+    """
+    payload = json.dumps({'altair': alt.__version__, 'spec': chart.to_dict()}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def write_data_file(records):
+    """Write the shared data file, but only if its contents changed"""
+    path = os.path.join(CHARTS_DIR, *DATA_FILE.split('/'))
+    content = json.dumps(records)
+
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return True
+
+
+def chart_jobs():
+    """One job per chart: a top 10 per region and aspect, plus a scatter per region"""
+    jobs = []
+
+    for region_id, region in REGIONS.items():
+        for aspect, aspect_title in ASPECT_TITLES.items():
+            jobs.append({
+                'kind': 'top',
+                'region': region_id,
+                'aspect': aspect,
+                'title': f"Top 10 Near {region['title']}: {aspect_title}",
+                'file': f"{region_id}_top_{aspect}.html"
+            })
+
+        jobs.append({
+            'kind': 'scatter',
+            'region': region_id,
+            'title': f"Studyability vs Google Rating ({region['title']})",
+            'file': f"{region_id}_studyability_vs_rating.html"
+        })
+
+    return jobs
+
+
+def make_chart(job):
+    """Build the Altair chart for a job"""
+    data = alt.UrlData(url=DATA_FILE, format=alt.DataFormat(type='json'))
+    in_region = f"indexof(datum.regions, '{job['region']}') >= 0"
+
+    if job['kind'] == 'top':
+        aspect = job['aspect']
+        chart = alt.Chart(data).transform_filter(
+            in_region
+        ).transform_filter(
+            f"isValid(datum.{aspect})"
+        ).transform_window(
+            rank='row_number()',
+            sort=[alt.SortField(aspect, order='descending')]
+        ).transform_filter(
+            'datum.rank <= 10'
+        ).mark_bar().encode(
+            x=alt.X(f'{aspect}:Q', title=f"{ASPECT_TITLES[aspect]} Score (0-10)", scale=alt.Scale(domain=[0, 10])),
+            y=alt.Y('name:N', sort='-x', title=''),
+            color=alt.Color(f'{aspect}:Q', scale=alt.Scale(scheme='redyellowgreen'), legend=None),
+            tooltip=['name:N', 'studyability:Q', 'google_rating:Q', 'noise:Q', 'wifi:Q', 'outlets:Q']
+        ).properties(
+            title=job['title'],
+            width=600,
+            height=400
+        )
+    else:
+        chart = alt.Chart(data).transform_filter(
+            in_region
+        ).mark_circle(size=100).encode(
+            x=alt.X('google_rating:Q', title='Google Rating', scale=alt.Scale(domain=[0, 5])),
+            y=alt.Y('studyability:Q', title='Studyability Score', scale=alt.Scale(domain=[0, 10])),
+            color=alt.Color('studyability:Q', scale=alt.Scale(scheme='redyellowgreen')),
+            tooltip=['name:N', 'studyability:Q', 'google_rating:Q']
+        ).properties(
+            title=job['title'],
+            width=500,
+            height=400
+        )
+
+    return chart
+
+
+def build_chart(job):
+    """Build and save one chart (runs in a worker process)"""
+    make_chart(job).save(os.path.join(CHARTS_DIR, job['file']))
+    return job['file']
+
+
+def load_cache():
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache):
+    with open(CACHE_FILE, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+
+def main():
+    os.makedirs(CHARTS_DIR, exist_ok=True)
+
+    records = load_records()
+    if write_data_file(records):
+        print(f"✓ Updated {os.path.join(CHARTS_DIR, DATA_FILE)}")
+
+    # Only rebuild charts whose spec changed (or whose HTML is missing).
+    # Data changes don't need a rebuild - the charts load the data file.
+    cache = load_cache()
+    jobs = chart_jobs()
+    for job in jobs:
+        job['spec_hash'] = spec_hash(make_chart(job))
+
+    stale = [
+        job for job in jobs
+        if cache.get(job['file']) != job['spec_hash']
+        or not os.path.exists(os.path.join(CHARTS_DIR, job['file']))
+    ]
+
+    print(f"{len(jobs) - len(stale)} charts up to date, {len(stale)} to build")
+
+    if stale:
+        try:
+            with ProcessPoolExecutor() as executor:
+                for job, chart_file in zip(stale, executor.map(build_chart, stale)):
+                    cache[job['file']] = job['spec_hash']
+                    print(f"✓ Saved {os.path.join(CHARTS_DIR, chart_file)}")
+        finally:
+            # Keep whatever was built even if one chart failed
+            save_cache(cache)
+
+    # The charts load data/cafes.json, which browsers block over file://
+    print(f"\n🎨 Run `python -m http.server --directory {CHARTS_DIR}` and open http://localhost:8000 to see your visualizations!")
+
+
+if __name__ == '__main__':
+    main()